@@ -0,0 +1,224 @@
+"""Simulate Recipe Master dialogues and compare LLM calls with and without local slot filling
+
+The dialogues are hand-written scenarios, not recorded conversations. Each simulated user
+has an opening message and queued answers per slot. The user answers whatever question is
+actually asked: a local template question, or the first missing slot when the LLM is called
+(recipe_system_prompt makes the chef ask for missing slots). Unclear answers are followed by
+a clarified one, as the chef re-asks them.
+
+The baseline assumes the chef asks about exactly one slot per turn and every user turn is
+an LLM call, so the reduction is an estimate under the same assumptions as the extractor.
+"""
+from recipe_slot_filler import RecipeSlotFiller
+
+MAX_TURNS = 20
+
+# Chef questions as phrased by the LLM, not by the local templates
+LLM_QUESTIONS = {
+    "products": "Отлично! Какие ингредиенты у тебя есть под рукой?",
+    "equipment": "Какая кухонная техника у тебя есть?",
+    "difficulty": "Какой уровень сложности блюда тебе нужен?",
+    "time": "Сколько у тебя есть времени на приготовление?",
+}
+
+SIMULATED_USERS = [
+    {
+        "opening": "Хочу что-нибудь на ужин",
+        "answers": {
+            "products": ["курица, рис, морковь, лук"],
+            "equipment": ["плита и сковорода"],
+            "difficulty": ["простой"],
+            "time": ["40 минут"],
+        },
+        "expected": {"products": ["курица", "рис", "морковь", "лук"], "equipment": ["плита", "сковорода"], "difficulty": "простой", "time": "40 мин"},
+    },
+    {
+        "opening": "Хочу пасту",
+        "answers": {
+            "products": ["макароны, помидоры, чеснок, пармезан"],
+            "equipment": ["плита"],
+            "difficulty": ["не знаю, а какой лучше?", "средний"],
+            "time": ["полчаса"],
+        },
+        "expected": {"products": ["макароны", "помидоры", "чеснок", "пармезан"], "equipment": ["плита"], "difficulty": "средний", "time": "30 мин"},
+    },
+    {
+        "opening": "Есть тофу и киноа, что можно сделать?",
+        "answers": {
+            "products": ["тофу, киноа, перец"],
+            "equipment": ["мультиварка"],
+            "difficulty": ["несложный"],
+            "time": ["минут 40-50", "45 минут"],
+        },
+        "expected": {"products": ["тофу", "киноа", "перец"], "equipment": ["мультиварка"], "difficulty": "простой", "time": "45 мин"},
+    },
+    {
+        "opening": "Хочу испечь хлеб",
+        "answers": {
+            "products": ["мука, дрожжи, соль, сахар"],
+            "equipment": ["духовка, форма для хлеба"],
+            "difficulty": ["средний"],
+            "time": ["примерно час-полтора", "2 часа"],
+        },
+        "expected": {"products": ["мука", "дрожжи", "соль", "сахар"], "equipment": ["духовка", "форма для хлеба"], "difficulty": "средний", "time": "2 ч"},
+    },
+    {
+        "opening": "Привет! Приготовь мне что-нибудь из гречки",
+        "answers": {
+            "products": ["гречка, грибы, лук"],
+            "equipment": ["нет плиты, есть микроволновка"],
+            "difficulty": ["простой"],
+            "time": ["20 минут"],
+        },
+        "expected": {"products": ["гречка", "грибы", "лук"], "equipment": ["микроволновка"], "difficulty": "простой", "time": "20 мин"},
+    },
+    {
+        "opening": "Что приготовить из фарша?",
+        "answers": {
+            "products": ["фарш, лук, батон, яйца"],
+            "equipment": ["плита и сковородка"],
+            "difficulty": ["на твой вкус", "простой"],
+            "time": ["1 час"],
+        },
+        "expected": {"products": ["фарш", "лук", "хлеб", "яйца"], "equipment": ["плита", "сковорода"], "difficulty": "простой", "time": "1 ч"},
+    },
+    {
+        "opening": "Хочу салат",
+        "answers": {
+            "products": ["огурцы, помидоры, фета, оливки"],
+            "equipment": ["ничего нет"],
+            "difficulty": ["простой"],
+            "time": ["15 минут"],
+        },
+        "expected": {"products": ["огурцы", "помидоры", "фета", "оливки"], "equipment": ["нет оборудования"], "difficulty": "простой", "time": "15 мин"},
+    },
+    {
+        "opening": "лосось и шпинат, хочу что-то ресторанное",
+        "opening_fills": ["difficulty"],
+        "answers": {
+            "products": ["лосось, сливки, шпинат"],
+            "equipment": ["духовка и плита"],
+            "difficulty": ["сложный"],
+            "time": ["полтора часа"],
+        },
+        "expected": {"products": ["лосось", "сливки", "шпинат"], "equipment": ["духовка", "плита"], "difficulty": "сложный", "time": "1 ч 30 мин"},
+    },
+    # Two time units in one answer
+    {
+        "opening": "Хочу рагу",
+        "answers": {
+            "products": ["картошка, кабачок, морковь"],
+            "equipment": ["плита и средняя кастрюля"],
+            "difficulty": ["простой"],
+            "time": ["1 час 30 минут"],
+        },
+        "expected": {"products": ["картофель", "кабачок", "морковь"], "equipment": ["плита", "кастрюля"], "difficulty": "простой", "time": "1 ч 30 мин"},
+    },
+    # Words of other slots inside products and equipment answers
+    {
+        "opening": "Сделай что-нибудь сытное",
+        "answers": {
+            "products": ["курица, лёгкий майонез, рис, 1 ч. л. соли", "курица, лёгкий майонез, рис, соль"],
+            "equipment": ["сковорода и средняя кастрюля"],
+            "difficulty": ["сложный"],
+            "time": ["2 ч 15 мин"],
+        },
+        "expected": {"products": ["курица", "лёгкий майонез", "рис", "соль"], "equipment": ["сковорода", "кастрюля"], "difficulty": "сложный", "time": "2 ч 15 мин"},
+    },
+    # Unclear difficulty answers after a first message with hints
+    {
+        "opening": "Хочу курицу",
+        "answers": {
+            "products": ["курица, рис"],
+            "equipment": ["плита"],
+            "difficulty": ["что-нибудь попроще", "не очень сложный", "простой"],
+            "time": ["40 минут"],
+        },
+        "expected": {"products": ["курица", "рис"], "equipment": ["плита"], "difficulty": "простой", "time": "40 мин"},
+    },
+    # Quantities and vague phrases instead of products
+    {
+        "opening": "Хочу ужин",
+        "answers": {
+            "products": ["что угодно", "на 4 порции", "у меня есть плита", "фарш, макароны"],
+            "equipment": ["плита"],
+            "difficulty": ["средний"],
+            "time": ["полчаса"],
+        },
+        "expected": {"products": ["фарш", "макароны"], "equipment": ["плита"], "difficulty": "средний", "time": "30 мин"},
+    },
+]
+
+
+def baseline_calls(user):
+    """Every user turn is an LLM call: opening plus every answer the chef has to ask for"""
+    opening_fills = user.get("opening_fills", [])
+    return 1 + sum(len(answers) for slot, answers in user["answers"].items() if slot not in opening_fills)
+
+
+def next_answer(user, queues, slot):
+    queue = queues[slot]
+    return queue.pop(0) if len(queue) > 1 else queue[0]
+
+
+def simulate(user):
+    """Return LLM calls with local slot filling and the collected slots"""
+    filler = RecipeSlotFiller()
+    queues = {slot: list(answers) for slot, answers in user["answers"].items()}
+    info = {}
+    llm_calls = 0
+    text = user["opening"]
+
+    for _ in range(MAX_TURNS):
+        needs_llm = filler.update(info, text)
+        if filler.is_complete(info):
+            # Final recipe request
+            return llm_calls + 1, info
+
+        if needs_llm:
+            llm_calls += 1
+            # Chef asks about the first slot that is not clearly answered yet
+            asked_slot = filler.missing_slots(info)[0]
+            filler.expect_answer(info, LLM_QUESTIONS[asked_slot])
+        else:
+            filler.next_question(info)
+            asked_slot = info["pending"]
+        text = next_answer(user, queues, asked_slot)
+
+    return llm_calls, info
+
+
+def check_slots(info, expected):
+    """Return list of slots whose collected value differs from expected"""
+    wrong = []
+    for slot, value in expected.items():
+        collected = info.get(slot)
+        if isinstance(value, list):
+            if sorted(collected or []) != sorted(value):
+                wrong.append(f"{slot}={collected}")
+        elif collected != value:
+            wrong.append(f"{slot}={collected}")
+    return wrong
+
+
+def main():
+    baseline_total = 0
+    local_total = 0
+    correct = 0
+    for index, user in enumerate(SIMULATED_USERS, 1):
+        baseline = baseline_calls(user)
+        local, info = simulate(user)
+        wrong = check_slots(info, user["expected"])
+        baseline_total += baseline
+        local_total += local
+        correct += not wrong
+        status = "slots correct" if not wrong else f"WRONG slots: {', '.join(wrong)}"
+        print(f"Dialogue {index}: baseline {baseline} LLM calls, local slot filling {local} ({status})")
+
+    reduction = 100 * (baseline_total - local_total) / baseline_total
+    print(f"\nTotal: baseline {baseline_total} LLM calls, local slot filling {local_total} ({reduction:.0f}% fewer)")
+    print(f"Dialogues with correct slots: {correct}/{len(SIMULATED_USERS)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Compare full-history summarization with incremental summarization on sample conversations
+
+Requires OPENROUTER_API_KEY, makes real requests to OpenRouter. No measured results are
+committed with the bot: token and latency reductions are unmeasured until this is run.
+
+Time is the compaction wait the user sees. For the incremental summarizer it excludes
+digests computed in background as messages arrive, their tokens are counted.
+"""
+import asyncio
+import os
+import time
+from typing import Dict, List, Optional
+from dotenv import load_dotenv
+from openrouter_client import OpenRouterClient
+from incremental_summarizer import IncrementalSummarizer
+
+# Sample text mode conversations, compacted after every 5 user messages like in telegram_bot.py
+SHORT_CONVERSATION = [
+    ("How do black holes form?", "Black holes form when a massive star exhausts its nuclear fuel and its core collapses under gravity. If the remaining core is above roughly three solar masses, no known force can stop the collapse, and the matter is compressed into a region so dense that not even light can escape. Black holes can also grow by merging with other black holes or by accreting gas, and supermassive black holes at galaxy centers probably formed from early seeds that grew over billions of years."),
+    ("What is an event horizon?", "The event horizon is the boundary around a black hole beyond which nothing, not even light, can escape. Its radius, the Schwarzschild radius, is proportional to the mass of the black hole, so a black hole with the mass of the Sun would have a horizon about three kilometers in radius. To a distant observer, objects approaching the horizon appear to slow down and redden, while the falling object itself crosses the horizon in finite time."),
+    ("Can anything escape?", "Classically nothing escapes, but quantum effects predict Hawking radiation, a faint thermal glow that slowly carries energy away from the black hole. For stellar black holes this radiation is far colder than the cosmic microwave background, so in practice they are still growing today. Only tiny primordial black holes, if they exist, would evaporate on timescales shorter than the age of the universe."),
+    ("How were black holes first observed?", "The first strong evidence came from X-ray binaries such as Cygnus X-1 in the 1970s, where a compact invisible object too heavy to be a neutron star pulls gas from a companion star. Later, tracking stars orbiting Sagittarius A* revealed a four-million-solar-mass object at the center of the Milky Way. In 2015 LIGO detected gravitational waves from merging black holes, and in 2019 the Event Horizon Telescope published the first image of the shadow of the black hole in M87."),
+    ("What is spaghettification?", "Spaghettification is the stretching of an object falling toward a black hole caused by tidal forces: gravity pulls the nearer end much harder than the far end. Near a stellar-mass black hole this happens well outside the horizon and would be fatal, while near a supermassive black hole the tidal forces at the horizon are weak enough that an astronaut could cross it intact."),
+    ("Is our Sun going to become a black hole?", "No. The Sun is far too light to become a black hole. In about five billion years it will swell into a red giant, shed its outer layers as a planetary nebula and leave behind a white dwarf roughly the size of the Earth, which will slowly cool over trillions of years."),
+    ("What about neutron stars?", "Neutron stars are the collapsed cores of stars between about eight and twenty solar masses. They pack more mass than the Sun into a sphere about twenty kilometers across, are supported by neutron degeneracy pressure and nuclear forces, and can spin hundreds of times per second, appearing as pulsars when their beams sweep past the Earth."),
+    ("How do pulsars work?", "A pulsar is a rotating neutron star with a strong magnetic field whose axis is tilted relative to its spin axis. Charged particles accelerated along the magnetic poles emit beams of radio waves and sometimes X-rays, and as the star spins the beams sweep across space like a lighthouse, producing regular pulses on Earth with remarkable timing stability."),
+    ("Can pulsars be used for navigation?", "Yes. Because millisecond pulsars are extremely stable clocks, a spacecraft measuring pulse arrival times from several pulsars can determine its position in the solar system, much like GPS. NASA demonstrated this with the SEXTANT experiment on the International Space Station in 2017, achieving accuracy of a few kilometers."),
+    ("What is a magnetar?", "A magnetar is a neutron star with an exceptionally strong magnetic field, up to a thousand times stronger than ordinary neutron stars. The decay of this field powers bursts of X-rays and gamma rays, and occasional giant flares can briefly outshine entire galaxies in gamma rays; some fast radio bursts have been traced to magnetars."),
+]
+
+# Long answers, like DeepSeek R1T2 with the default 4000 max tokens gives
+LONG_CONVERSATION = [
+    ("How do I bake sourdough bread at home?", "Baking sourdough at home takes three things: an active starter, time and steady temperature. Feed your starter with equal weights of flour and water eight to twelve hours before mixing, and use it when it has doubled and smells pleasantly sour. Mix 500 g of bread flour with 350 g of water and let it rest for an hour; this autolyse lets the flour hydrate and gluten start forming without kneading. Then add 100 g of starter and 10 g of salt, squeeze them in with wet hands and start bulk fermentation. During the first two hours do four sets of stretch and folds, thirty minutes apart: grab one side of the dough, stretch it up and fold it over, rotate the bowl and repeat four times. After that leave the dough covered until it has grown by about half, is domed and shows bubbles on the sides, which takes four to six hours at 24 degrees. Shape it into a tight ball, put it seam side up into a floured banneton and refrigerate it overnight. Bake straight from the fridge in a Dutch oven preheated to 250 degrees: twenty minutes with the lid on, then twenty to twenty-five minutes with the lid off at 230 degrees until the crust is deep brown."),
+    ("My starter is not rising, what is wrong?", "A starter that does not rise usually has one of four problems: temperature, flour, feeding ratio or age. Below about 22 degrees the yeast and bacteria work very slowly, so move the jar somewhere warmer, for example inside the oven with only the light on, or next to a radiator but not on it. Whole grain rye or whole wheat flour contains more nutrients and wild microorganisms than white flour, so feeding with a quarter rye often wakes a sluggish starter within two or three days. If you keep too much old starter and add little fresh flour, the mixture stays too acidic and the yeast is suppressed; discard all but 20 g and feed it with 100 g of flour and 100 g of water. Chlorinated tap water can also slow things down, so use filtered water or let tap water stand overnight. Finally, a new starter needs one to two weeks to stabilize: the vigorous bubbling on day two or three comes from bacteria that die off later, and a quiet period after that is normal. Keep feeding on a regular schedule, mark the level with a rubber band, and expect it to double reliably within six to eight hours once it is established."),
+    ("How do I know when bulk fermentation is done?", "Judging the end of bulk fermentation by the clock is unreliable because temperature and starter strength change the timing a lot, so look at the dough itself. Use a straight-sided container and mark the starting level: most recipes aim for a 50 to 75 percent increase in volume, less for high whole grain doughs. The surface should be slightly domed where it meets the container and you should see bubbles of different sizes on the top and sides. When you jiggle the container, the dough should wobble like set jelly rather than sit stiff. It should feel airy and light, pull away from the walls in one cohesive mass and no longer be sticky and shaggy. If you pinch off a piece and stretch it thin, it should hold a translucent membrane. Under-fermented dough is dense, tight and bakes into a loaf with a tight crumb and a few big tunnels under the crust; over-fermented dough is slack, very sticky and spreads flat when turned out. When in doubt it is better to end bulk slightly early, because the dough keeps fermenting slowly in the fridge during the overnight proof."),
+    ("Why is my crust too thick and hard?", "A crust that is too thick and hard is usually caused by baking too long at too low a temperature, by missing steam, or by too much flour on the surface. Steam in the first twenty minutes keeps the outside of the loaf soft so it can expand and gelatinize into a thin, glossy crust; without it the surface dries and sets early, then keeps thickening for the whole bake. A preheated Dutch oven traps the steam from the dough itself, and if you bake on a stone, pour a cup of boiling water into a tray on the bottom rack right after loading. Bake hot and relatively short: 250 degrees with the lid on and 230 degrees without it, and take the loaf out when its internal temperature reaches 96 to 98 degrees instead of waiting for a very dark color. Brush off excess flour from the banneton before baking, because it toasts into a hard layer. Cooling on a rack rather than in the pot keeps the bottom from steaming and then hardening. If you prefer a softer crust, brush the hot loaf with melted butter or wrap it in a towel while it cools, and store it in a paper bag rather than open on the counter."),
+    ("Can I use the same dough for pizza?", "Yes, sourdough bread dough makes very good pizza, but you will get better results with a few changes. Bread dough is usually shaped for a long cold proof in one piece, while pizza wants smaller balls of 230 to 260 g each, proofed separately so the gluten relaxes and the dough stretches without springing back. Hydration around 65 to 70 percent is easier to handle for home ovens; the 70 percent bread dough works if you oil your hands and the counter. Many pizza makers add 2 to 3 percent olive oil, which makes the crust more tender and helps it brown at the lower temperatures of a domestic oven. After bulk fermentation divide the dough, shape tight balls and keep them in the fridge for 24 to 72 hours in oiled containers; longer cold fermentation gives more flavor and better blistering. Take them out two hours before baking so they reach room temperature. Preheat the oven to its maximum with a pizza stone or steel on the top rack for 45 minutes, stretch by hand rather than with a rolling pin to keep the rim airy, top sparingly and bake for seven to nine minutes, switching to the grill for the last minute to char the top."),
+    ("What toppings go well with a sourdough crust?", "A sourdough crust has a tangy, slightly complex flavor, so toppings that balance acidity with fat, salt and sweetness work best. A classic margherita with San Marzano tomatoes crushed by hand, fresh mozzarella, basil and good olive oil lets the crust shine. Bianca pizzas without tomato pair very well with the sour note: try ricotta, mozzarella, thinly sliced potatoes, rosemary and sea salt, or mozzarella with caramelized onions and gorgonzola finished with a drizzle of honey after baking. Cured meats such as salami, nduja or prosciutto add salt and fat; add prosciutto after baking so it stays silky. Roasted vegetables like peppers, eggplant and mushrooms should be cooked beforehand to drive off water, otherwise the center turns soggy. Keep toppings light, because a home oven cannot cook a heavily loaded pizza before the base burns, and add fresh ingredients such as arugula, basil, lemon zest or shaved parmesan right before serving."),
+]
+
+LEGACY_MAX_TOKENS = 4000
+
+
+async def legacy_summary(client: OpenRouterClient, model: str, conversation: List[Dict[str, str]], previous_summary: Optional[str], stats: Dict) -> Optional[str]:
+    """Previous approach: whole conversation and previous summary sent to user's model"""
+    if previous_summary:
+        system_content = f"Summarize the following conversation in one paragraph (maximum 5 sentences, approximately 1000 characters) in English. Capture the key topics, questions, and important context.\n\nPrevious summary: {previous_summary}\n\nNow create a new comprehensive summary that incorporates both the previous summary and the new conversation below."
+    else:
+        system_content = "Summarize the following conversation in one paragraph (maximum 5 sentences, approximately 1000 characters) in English. Capture the key topics, questions, and important context."
+
+    started = time.monotonic()
+    api_response = await client.send_message([{"role": "system", "content": system_content}] + conversation, "text", model,
+                                             temperature=0.0, max_tokens=LEGACY_MAX_TOKENS, system_prompt_enabled=False)
+    stats["seconds"] += time.monotonic() - started
+    if not api_response:
+        return None
+    stats["prompt_tokens"] += api_response['prompt_tokens']
+    stats["completion_tokens"] += api_response['completion_tokens']
+    stats["requests"] += 1
+    return api_response['content']
+
+
+async def replay(conversation_pairs, summarize, on_message=None) -> None:
+    """Replay conversation with compaction after every 5 user messages, keeping current message"""
+    conversation = []
+    summary = None
+    for question, answer in conversation_pairs:
+        conversation.append({"role": "user", "content": question})
+        if on_message:
+            on_message(conversation[-1])
+        if sum(1 for msg in conversation if msg["role"] == "user") >= 5:
+            summary = await summarize(conversation, summary) or summary
+            conversation = [conversation[-1]]
+        conversation.append({"role": "assistant", "content": answer})
+        if on_message:
+            on_message(conversation[-1])
+            # Only let background digests start, unfinished ones are awaited at compaction (pessimistic wait)
+            await asyncio.sleep(0)
+
+
+def print_stats(name: str, legacy_stats: Dict, incremental_stats: Dict) -> None:
+    print(name)
+    for label, stats in (("Full history", legacy_stats), ("Incremental", incremental_stats)):
+        print(f"  {label}: prompt {stats['prompt_tokens']}, completion {stats['completion_tokens']} tokens, "
+              f"{stats['requests']} requests, {stats['seconds']:.2f}s compaction wait")
+
+    for field in ("prompt_tokens", "completion_tokens", "seconds"):
+        if legacy_stats[field]:
+            reduction = 100 * (legacy_stats[field] - incremental_stats[field]) / legacy_stats[field]
+            print(f"  {field}: {reduction:.0f}% reduction")
+
+
+async def main() -> None:
+    load_dotenv()
+    api_key = os.getenv('OPENROUTER_API_KEY')
+    if not api_key:
+        raise ValueError("Missing required environment variable: OPENROUTER_API_KEY")
+
+    client = OpenRouterClient(api_key)
+    legacy_model = os.getenv('BENCHMARK_LEGACY_MODEL', 'deepseek')
+    summary_model = os.getenv('SUMMARY_MODEL', 'nova2')
+    if summary_model not in client.models:
+        raise ValueError(f"Invalid SUMMARY_MODEL: {summary_model}. Must be one of: {', '.join(client.models)}")
+
+    for name, conversation_pairs in (("Short conversation", SHORT_CONVERSATION), ("Long conversation", LONG_CONVERSATION)):
+        legacy_stats = {"prompt_tokens": 0, "completion_tokens": 0, "requests": 0, "seconds": 0.0}
+        await replay(conversation_pairs, lambda conversation, summary: legacy_summary(client, legacy_model, conversation, summary, legacy_stats))
+
+        summarizer = IncrementalSummarizer(client, summary_model, int(os.getenv('SUMMARY_MAX_TOKENS', '300')))
+        await replay(conversation_pairs, lambda conversation, summary: summarizer.summarize(0, conversation, summary),
+                     lambda message: summarizer.add_message(0, message))
+        # Digests of the last messages would be used by the next compaction, count their tokens too
+        await asyncio.gather(*summarizer.pending[0].values())
+
+        print_stats(name, legacy_stats, summarizer.stats)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,111 @@
+import asyncio
+import hashlib
+import logging
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+from openrouter_client import OpenRouterClient
+
+logger = logging.getLogger(__name__)
+
+
+class IncrementalSummarizer:
+    """Rolling conversation summary merged from per-message digests computed as messages arrive"""
+
+    def __init__(self, client: OpenRouterClient, model: str = "nova2", max_tokens: int = 300,
+                 digest_max_tokens: int = 80, digest_min_length: int = 200, cache_size: int = 100):
+        self.client = client
+        self.model = model
+        self.max_tokens = max_tokens
+        self.digest_max_tokens = digest_max_tokens
+        # Messages up to this length are used verbatim, without an API call and without caching
+        self.digest_min_length = digest_min_length
+        self.cache_size = cache_size
+        # Only digests produced by the model are cached, per user and shared by all modes
+        self.digests: Dict[int, Dict[str, str]] = defaultdict(dict)
+        self.pending: Dict[int, Dict[str, asyncio.Task]] = defaultdict(dict)
+        self.stats = {"prompt_tokens": 0, "completion_tokens": 0, "requests": 0, "seconds": 0.0}
+        self.digest_system_prompt = "Condense the following chat message into one short sentence in English. Keep names, numbers, ingredients and decisions. Output only the sentence."
+        self.merge_system_prompt = "Merge the following notes into one paragraph (maximum 5 sentences, approximately 1000 characters) in English. Capture the key topics, questions, and important context. Output only the paragraph."
+
+    @staticmethod
+    def _message_key(message: Dict[str, str]) -> str:
+        return hashlib.sha1(f"{message.get('role')}:{message.get('content')}".encode("utf-8")).hexdigest()
+
+    async def _complete(self, system_content: str, user_content: str, max_tokens: int) -> Optional[str]:
+        api_response = await self.client.send_message(
+            [{"role": "system", "content": system_content}, {"role": "user", "content": user_content}],
+            "text",
+            self.model,
+            temperature=0.0,
+            max_tokens=max_tokens,
+            system_prompt_enabled=False  # Custom system prompt is passed in messages
+        )
+        if not api_response or not api_response.get('content'):
+            return None
+
+        self.stats["prompt_tokens"] += api_response['prompt_tokens']
+        self.stats["completion_tokens"] += api_response['completion_tokens']
+        self.stats["requests"] += 1
+        return api_response['content'].strip()
+
+    async def _digest(self, user_id: int, key: str, content: str) -> Optional[str]:
+        """Condense long message with the model and cache the result"""
+        digest = await self._complete(self.digest_system_prompt, content, self.digest_max_tokens)
+        if not digest:
+            return None
+
+        user_digests = self.digests[user_id]
+        user_digests[key] = digest
+        while len(user_digests) > self.cache_size:
+            user_digests.pop(next(iter(user_digests)))
+        return digest
+
+    def add_message(self, user_id: int, message: Dict[str, str]) -> None:
+        """Start condensing a new long message in background, so compaction only merges ready digests"""
+        content = message.get("content", "")
+        key = self._message_key(message)
+        if len(content) <= self.digest_min_length or key in self.digests[user_id] or key in self.pending[user_id]:
+            return
+
+        user_pending = self.pending[user_id]
+        task = asyncio.create_task(self._digest(user_id, key, content))
+        user_pending[key] = task
+        task.add_done_callback(lambda _: user_pending.pop(key, None))
+
+    async def _note(self, user_id: int, message: Dict[str, str]) -> str:
+        role = message.get("role", "user")
+        content = message.get("content", "")
+        if len(content) <= self.digest_min_length:
+            return f"{role}: {content}"
+
+        key = self._message_key(message)
+        digest = self.digests[user_id].get(key)
+        if digest is None:
+            task = self.pending[user_id].get(key)
+            # Message was not passed to add_message (e.g. after restart), condense it now
+            digest = await task if task else await self._digest(user_id, key, content)
+        if not digest:
+            # Use the beginning of the message for this summary only, the digest is retried next time
+            digest = content[:self.digest_min_length]
+        return f"{role}: {digest}"
+
+    async def summarize(self, user_id: int, messages: List[Dict[str, str]], previous_summary: Optional[str] = None) -> Optional[str]:
+        """Merge digests of messages into previous summary with a single request"""
+        started = time.monotonic()
+        notes = await asyncio.gather(*(self._note(user_id, message) for message in messages))
+
+        user_content = "\n".join(notes)
+        if previous_summary:
+            user_content = f"Previous summary: {previous_summary}\n\nNew notes:\n{user_content}"
+        summary = await self._complete(self.merge_system_prompt, user_content, self.max_tokens)
+
+        elapsed = time.monotonic() - started
+        self.stats["seconds"] += elapsed
+        logger.info(f"Incremental summary for user {user_id} took {elapsed:.2f}s, totals: {self.stats}")
+        return summary
+
+    def clear(self, user_id: int) -> None:
+        for task in self.pending.pop(user_id, {}).values():
+            task.cancel()
+        self.digests.pop(user_id, None)
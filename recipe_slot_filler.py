@@ -0,0 +1,319 @@
+import re
+import logging
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class RecipeSlotFiller:
+    """Deterministic extractor of Recipe Master slots from Russian user messages"""
+
+    SLOTS = ("products", "equipment", "difficulty", "time")
+
+    def __init__(self):
+        # Canonical product name -> regex matching its word forms
+        self.products = {
+            "курица": r"куриц\w*|курин\w*|курятин\w*",
+            "говядина": r"говядин\w*|говяж\w*",
+            "свинина": r"свинин\w*|свин\w*",
+            "фарш": r"фарш\w*",
+            "рыба": r"рыб\w*",
+            "лосось": r"лосос\w*|семг\w*|сёмг\w*",
+            "креветки": r"кревет\w*",
+            "яйца": r"яйц\w*|яиц\w*|яичк\w*",
+            "молоко": r"молок\w*",
+            "сыр": r"сыр|сыра|сыром|сыру|сырок\w*",
+            "творог": r"творог\w*",
+            "сметана": r"сметан\w*",
+            "сливки": r"сливк\w*|сливок",
+            "масло": r"масл\w*",
+            "мука": r"мук\w*",
+            "рис": r"рис|риса|рисом|рису",
+            "гречка": r"гречк\w*|гречнев\w*",
+            "макароны": r"макарон\w*|паст[аыу]|спагетти",
+            "картофель": r"картош\w*|картоф\w*",
+            "морковь": r"морков\w*|морковк\w*",
+            "лук": r"лук|лука|луком|луковиц\w*",
+            "чеснок": r"чеснок\w*|чесноч\w*",
+            "помидоры": r"помидор\w*|томат\w*",
+            "огурцы": r"огур\w*",
+            "капуста": r"капуст\w*",
+            "свекла": r"свекл\w*|свёкл\w*",
+            "перец": r"перец|перц\w*",
+            "кабачок": r"кабач\w*",
+            "баклажан": r"баклажан\w*",
+            "грибы": r"гриб\w*|шампиньон\w*",
+            "фасоль": r"фасол\w*",
+            "зелень": r"зелен\w*|укроп\w*|петрушк\w*",
+            "яблоки": r"яблок\w*|яблоч\w*",
+            "бананы": r"банан\w*",
+            "хлеб": r"хлеб\w*|батон\w*",
+            "сахар": r"сахар\w*",
+            "шоколад": r"шоколад\w*",
+        }
+        self.equipment = {
+            "плита": r"плит\w*|конфорк\w*",
+            "духовка": r"духовк\w*|духов(ой|ом) шкаф\w*",
+            "микроволновка": r"микроволнов\w*|свч",
+            "мультиварка": r"мультиварк\w*",
+            "аэрогриль": r"аэрогрил\w*|аэрофритюрниц\w*",
+            "гриль": r"(?<!аэро)грил\w*|мангал\w*",
+            "сковорода": r"сковород\w*|сковородк\w*",
+            "кастрюля": r"кастрюл\w*",
+            "блендер": r"блендер\w*",
+            "миксер": r"миксер\w*",
+            "пароварка": r"пароварк\w*",
+            "чайник": r"чайник\w*",
+        }
+        self.difficulty = {
+            "простой": r"прост(ой|ая|ое|ого|ую|енькое|енький|енькая)|л[её]гк\w*|несложн\w*|не сложн\w*|элементарн\w*",
+            "средний": r"средн\w*",
+            "сложный": r"(?<!не )сложн\w*|трудн\w*|ресторанн\w*",
+        }
+        # Explicit "no equipment" statement, valid as an answer to any question
+        self.no_equipment_pattern = re.compile(
+            r"\b(нет|без)\s+(никакого\s+|какого-либо\s+)?(кухонного\s+)?(оборудовани\w*|техник\w*)",
+            re.IGNORECASE
+        )
+        # Short negative answers, only meaningful as an answer to the equipment question
+        self.no_answer_pattern = re.compile(r"^\s*(ничего|ничего нет|нет|никакого|никакой)\s*[.!]*\s*$", re.IGNORECASE)
+        # Negation right before a lexicon item: "нет плиты", "без лука", "не курицу"
+        self.negation_pattern = re.compile(r"\b(нет|без|не|кроме)\s+(\w+\s+)?$", re.IGNORECASE)
+        # Lead-in words stripped from items of a comma-separated answer
+        self.item_prefix_pattern = re.compile(r"^(у меня\s+)?(есть|имеется|имеются|только|ещё|еще|и)\s+", re.IGNORECASE)
+        self.item_split_pattern = re.compile(r",|;|\s+и\s+", re.IGNORECASE)
+        # Answers that name a time range or an approximate time need clarification
+        self.vague_time_pattern = re.compile(
+            r"\d+\s*[-–—]\s*\d+|\bот\s+\d+|\bчас\w*\s*[-–—]\s*полтор\w*|\bили\b|"
+            r"\b(примерно|около|приблизительно|где-то|где то|плюс-минус|плюс минус|максимум|не больше|не более)\b|~",
+            re.IGNORECASE
+        )
+        # "1 ч. л." is a teaspoon, not an hour
+        self.time_pattern = re.compile(
+            r"(\d+(?:[.,]\d+)?)\s*(минут\w*|мин\b|м\b|час\w*|ч\b(?!\s*\.?\s*л\b))",
+            re.IGNORECASE
+        )
+        # Colloquial reversed order: "минут 40", "часа 2"
+        self.reversed_time_pattern = re.compile(
+            r"\b(минут\w*|час\w*)\s+(\d+(?:[.,]\d+)?)",
+            re.IGNORECASE
+        )
+        # Time phrases without digits, in minutes
+        self.word_time = {
+            "полтора часа": 90,
+            "четверть часа": 15,
+            "полчаса": 30,
+            "два часа": 120,
+            "три часа": 180,
+            "час": 60,
+        }
+        # Words allowed around a time answer, anything else makes the answer unclear
+        self.time_filler_words = {"и", "за", "на", "в", "у", "меня", "есть", "всего", "ровно", "готов", "готова",
+                                  "могу", "потратить", "думаю", "давай", "пусть", "будет"}
+        # Items that are not products or equipment: vague words and quantities
+        self.vague_item_pattern = re.compile(
+            r"\d|\b(что угодно|что-нибудь|что нибудь|что-то|всё|все|всякое|разное|ничего|много|мало|"
+            r"порци\w*|штук\w*|грамм\w*|кг|литр\w*|ложк\w*)\b",
+            re.IGNORECASE
+        )
+        # Phrases that leave the decision to the chef or are not clear answers
+        self.ambiguous_pattern = re.compile(
+            r"\?|на тво[её]\w* (вкус|усмотрени\w*)|выбери сам|реши сам|сам выбери|не знаю|"
+            r"\bлюб(ой|ое|ая|ые)\b|неважно|не важно|вс[её] равно|может быть|наверное|"
+            r"\bкроме\b|\bбез\s+(?!никакого|оборудовани|техник|плит)",
+            re.IGNORECASE
+        )
+        self.questions = {
+            "products": "Какие продукты у тебя есть? Перечисли их через запятую.",
+            "equipment": "Какое кухонное оборудование у тебя есть (плита, духовка, микроволновка и т.д.)? Если никакого нет - так и напиши.",
+            "difficulty": "Какой уровень сложности рецепта тебе подходит: простой, средний или сложный?",
+            "time": "Сколько времени ты готов потратить на готовку? Укажи конкретно, например '30 минут' или '1 час'.",
+        }
+        # Keywords used to recognize which slot an LLM question asks about
+        self.question_keywords = {
+            "products": r"продукт\w*|ингредиент\w*",
+            "equipment": r"оборудовани\w*|техник\w*",
+            "difficulty": r"сложност\w*",
+            "time": r"времен\w*|время",
+        }
+        self.slot_titles = {
+            "products": "Продукты",
+            "equipment": "Оборудование",
+            "difficulty": "Сложность",
+            "time": "Время",
+        }
+
+    def _match_lexicon(self, text: str, lexicon: Dict[str, str]) -> List[str]:
+        """Return lexicon items mentioned in text without a negation in front of them"""
+        found = []
+        for name, pattern in lexicon.items():
+            for match in re.finditer(rf"\b(?:{pattern})\b", text, re.IGNORECASE):
+                if not self.negation_pattern.search(text[:match.start()]):
+                    found.append(name)
+                    break
+        return found
+
+    def _split_items(self, text: str, lexicon: Dict[str, str], other_lexicon: Dict[str, str]) -> Tuple[List[str], bool]:
+        """Split answer into lexicon names plus user's own items. Returns items and whether all parts were usable"""
+        items = []
+        clear = True
+        for part in self.item_split_pattern.split(text):
+            part = self.item_prefix_pattern.sub("", part.strip(" .!")).lower()
+            if not part or self.negation_pattern.search(part + " "):
+                continue
+            known = self._match_lexicon(part, lexicon)
+            if known:
+                items.extend(item for item in known if item not in items)
+            elif (self.vague_item_pattern.search(part) or self.ambiguous_pattern.search(part)
+                  or any(re.fullmatch(pattern, part) for pattern in other_lexicon.values()) or len(part.split()) > 3):
+                # Quantity, vague phrase or item of the other slot, e.g. "на 4 порции" or "плита" for products
+                clear = False
+            elif part not in items:
+                # Item outside the lexicon, e.g. "тофу" or "форма для хлеба"
+                items.append(part)
+        return items, clear
+
+    @staticmethod
+    def _format_minutes(minutes: int) -> str:
+        hours, minutes = divmod(minutes, 60)
+        if not hours:
+            return f"{minutes} мин"
+        return f"{hours} ч {minutes} мин" if minutes else f"{hours} ч"
+
+    def _extract_time(self, text: str) -> Tuple[Optional[str], str]:
+        """Sum all time units in text ("1 час 30 минут" -> 90 минут). Returns formatted time and unparsed rest of text"""
+        total = 0.0
+        found = False
+        rest = text.lower()
+
+        for pattern, value_group, unit_group in ((self.time_pattern, 1, 2), (self.reversed_time_pattern, 2, 1)):
+            matches = list(pattern.finditer(rest))
+            for match in matches:
+                value = float(match.group(value_group).replace(",", "."))
+                total += value * 60 if match.group(unit_group).startswith("ч") else value
+            if matches:
+                found = True
+                rest = pattern.sub(" ", rest)
+                break
+
+        for phrase, minutes in self.word_time.items():
+            if re.search(rf"\b{phrase}\b", rest):
+                total += minutes
+                found = True
+                rest = re.sub(rf"\b{phrase}\b", " ", rest)
+
+        return (self._format_minutes(round(total)) if found else None), rest
+
+    def _is_time_answer_parsed(self, rest: str) -> bool:
+        """Check that nothing but filler words and a difficulty level is left after the time"""
+        if re.search(r"\d", rest):
+            return False
+        rest = re.sub(r"\b(?:" + "|".join(self.difficulty.values()) + r")\b", " ", rest)
+        return all(word in self.time_filler_words for word in re.findall(r"[а-яёa-z-]+", rest))
+
+    def extract(self, text: str, pending_slot: Optional[str] = None) -> Tuple[Dict, bool]:
+        """Extract slots from a single user message. Returns slots and whether the answer was clear
+
+        Products and equipment are taken only from an answer to their own question,
+        difficulty and time are never taken from an answer to the products or equipment question.
+        """
+        extracted = {}
+        clear = True
+
+        if pending_slot == "products":
+            products, clear = self._split_items(text, self.products, self.equipment)
+            # Partly unclear list is left to the LLM to re-ask as a whole
+            if products and clear:
+                extracted["products"] = products
+            return extracted, clear
+
+        if pending_slot == "equipment":
+            equipment, clear = self._split_items(text, self.equipment, self.products)
+            if equipment and clear:
+                extracted["equipment"] = equipment
+            elif self.no_equipment_pattern.search(text) or self.no_answer_pattern.match(text):
+                extracted["equipment"] = ["нет оборудования"]
+                clear = True
+            return extracted, clear
+
+        if pending_slot is None:
+            products = self._match_lexicon(text, self.products)
+            if products:
+                extracted["products"] = products
+            equipment = self._match_lexicon(text, self.equipment)
+            if equipment:
+                extracted["equipment"] = equipment
+            elif self.no_equipment_pattern.search(text):
+                extracted["equipment"] = ["нет оборудования"]
+
+        difficulty = self._match_lexicon(text, self.difficulty)
+        if len(difficulty) == 1:
+            extracted["difficulty"] = difficulty[0]
+        elif len(difficulty) > 1:
+            clear = False
+
+        time_value, rest = self._extract_time(text)
+        if time_value and (self.vague_time_pattern.search(text)
+                           or (pending_slot == "time" and not self._is_time_answer_parsed(rest))):
+            clear = False
+        elif time_value:
+            extracted["time"] = time_value
+
+        return extracted, clear
+
+    def update(self, info: Dict, text: str) -> bool:
+        """Fill slots in info from text. Returns True when the message needs the LLM"""
+        pending_slot = info.pop("pending", None)
+        extracted, clear = self.extract(text, pending_slot)
+
+        hints = []
+        if "hints" not in info:
+            # Unprompted first message: products and equipment are wishes, not answers to our questions
+            hints = extracted.pop("products", []) + extracted.pop("equipment", [])
+            info["hints"] = hints
+        elif pending_slot is None:
+            # Answer to a question asked by the LLM: only fill slots that are still empty
+            extracted = {slot: value for slot, value in extracted.items() if not info.get(slot)}
+
+        for slot, value in extracted.items():
+            if slot == pending_slot and slot in ("products", "equipment") and info.get(slot):
+                info[slot] = info[slot] + [item for item in value if item not in info[slot]]
+            elif slot == pending_slot or not info.get(slot):
+                info[slot] = value
+
+        # Only what this message produced counts as an answer
+        answered = bool(extracted) or bool(hints)
+        ambiguous = not answered or not clear or bool(self.ambiguous_pattern.search(text))
+        logger.info(f"Recipe slots after update: {self.format_slots(info)} (ambiguous: {ambiguous})")
+        return ambiguous
+
+    def missing_slots(self, info: Dict) -> List[str]:
+        return [slot for slot in self.SLOTS if not info.get(slot)]
+
+    def is_complete(self, info: Dict) -> bool:
+        return not self.missing_slots(info)
+
+    def next_question(self, info: Dict) -> Optional[str]:
+        """Return follow-up question for the first missing slot and remember it as pending"""
+        missing = self.missing_slots(info)
+        if not missing:
+            return None
+        info["pending"] = missing[0]
+        return self.questions[missing[0]]
+
+    def expect_answer(self, info: Dict, assistant_text: str) -> None:
+        """Remember the slot an LLM question asks about, when it asks about exactly one missing slot"""
+        asked = [slot for slot in self.missing_slots(info)
+                 if re.search(rf"\b(?:{self.question_keywords[slot]})\b", assistant_text, re.IGNORECASE)]
+        if len(asked) == 1:
+            info["pending"] = asked[0]
+
+    def format_slots(self, info: Dict) -> str:
+        parts = []
+        for slot in self.SLOTS:
+            value = info.get(slot)
+            if value:
+                parts.append(f"{self.slot_titles[slot]}: {', '.join(value) if isinstance(value, list) else value}")
+        if info.get("hints"):
+            parts.append(f"Пожелания: {', '.join(info['hints'])}")
+        return "; ".join(parts)
@@ -9,6 +9,8 @@ from aiogram.filters import CommandStart, Command
 from aiogram.types import Message, ReplyKeyboardMarkup, KeyboardButton, InlineKeyboardMarkup, InlineKeyboardButton, CallbackQuery
 from openrouter_client import OpenRouterClient
 from summary_storage import SummaryStorage
+from recipe_slot_filler import RecipeSlotFiller
+from incremental_summarizer import IncrementalSummarizer
 
 load_dotenv()
 
@@ -17,6 +19,8 @@ logger = logging.getLogger(__name__)
 
 TELEGRAM_TOKEN = os.getenv('TELEGRAM_BOT_TOKEN')
 OPENROUTER_API_KEY = os.getenv('OPENROUTER_API_KEY')
+SUMMARY_MODEL = os.getenv('SUMMARY_MODEL', 'nova2')
+SUMMARY_MAX_TOKENS = int(os.getenv('SUMMARY_MAX_TOKENS', '300'))
 
 if not TELEGRAM_TOKEN or not OPENROUTER_API_KEY:
     raise ValueError("Missing required environment variables: TELEGRAM_BOT_TOKEN or OPENROUTER_API_KEY")
@@ -25,6 +29,12 @@ bot = Bot(token=TELEGRAM_TOKEN)
 dp = Dispatcher()
 openrouter_client = OpenRouterClient(OPENROUTER_API_KEY)
 summary_storage = SummaryStorage()
+recipe_slot_filler = RecipeSlotFiller()
+
+if SUMMARY_MODEL not in openrouter_client.models:
+    raise ValueError(f"Invalid SUMMARY_MODEL: {SUMMARY_MODEL}. Must be one of: {', '.join(openrouter_client.models)}")
+
+summarizer = IncrementalSummarizer(openrouter_client, SUMMARY_MODEL, SUMMARY_MAX_TOKENS)
 
 user_conversations: Dict[int, Deque] = defaultdict(lambda: deque())
 user_output_preferences: Dict[int, str] = defaultdict(lambda: "text")
@@ -52,45 +62,19 @@ def count_user_messages(user_id: int, output_format: str) -> int:
     return sum(1 for msg in conversations if msg.get("role") == "user")
 
 
-async def create_summary(user_id: int, model_name: str, output_format: str) -> str:
-    """Create conversation summary using selected model"""
+async def create_summary(user_id: int, output_format: str) -> str:
+    """Fold conversation into rolling summary using cheap summary model"""
     # Get conversation history
     if output_format == "recipe":
         conversation_history = list(user_recipe_conversations[user_id])
     else:
         conversation_history = list(user_conversations[user_id])
 
-    # Build summarization prompt
-    # If there's an existing summary, include it in the system prompt for re-summarization
-    if user_id in user_summaries and user_summaries[user_id]:
-        system_content = f"Summarize the following conversation in one paragraph (maximum 5 sentences, approximately 1000 characters) in English. Capture the key topics, questions, and important context.\n\nPrevious summary: {user_summaries[user_id]}\n\nNow create a new comprehensive summary that incorporates both the previous summary and the new conversation below."
-    else:
-        system_content = "Summarize the following conversation in one paragraph (maximum 5 sentences, approximately 1000 characters) in English. Capture the key topics, questions, and important context."
-
-    summarization_system_prompt = {
-        "role": "system",
-        "content": system_content
-    }
-
-    # Prepare messages for summarization
-    messages_for_summary = [summarization_system_prompt]
-    messages_for_summary.extend(conversation_history)
-
     try:
-        # Call OpenRouter API with user's selected model for summarization
-        # Use temperature 0 for consistent summaries, max_tokens 4000
-        # Disable system_prompt_enabled since we manually add summarization system prompt above
-        api_response = await openrouter_client.send_message(
-            messages_for_summary,
-            "text",  # Always use text format for summaries
-            model_name,
-            temperature=0.0,
-            max_tokens=4000,
-            system_prompt_enabled=False  # Disabled - we manually added custom summarization prompt
-        )
-
-        if api_response and api_response.get('content'):
-            summary = api_response['content']
+        # Long messages were condensed as they arrived, only their digests and previous summary are merged
+        summary = await summarizer.summarize(user_id, conversation_history, user_summaries.get(user_id))
+
+        if summary:
             user_summaries[user_id] = summary
             summary_storage.save_summary(user_id, summary)
             logger.info(f"Created summary for user {user_id}: {summary[:100]}...")
@@ -205,6 +189,7 @@ async def clear_command_handler(message: Message) -> None:
     user_recipe_info[user_id].clear()
     user_summaries.pop(user_id, None)
     summary_storage.delete_summary(user_id)
+    summarizer.clear(user_id)
     await message.answer("SYSTEM: Conversation history cleared", reply_markup=get_reply_keyboard())
     logger.info(f"User {user_id} cleared conversation history and summary")
 
@@ -230,6 +215,7 @@ async def handle_model_selection(callback_query: CallbackQuery) -> None:
     user_recipe_info[user_id].clear()
     user_summaries.pop(user_id, None)
     summary_storage.delete_summary(user_id)
+    summarizer.clear(user_id)
 
     # Get model display name
     model_display_name = openrouter_client.get_model_display_name(model_key)
@@ -289,29 +275,44 @@ async def handle_message(message: Message) -> None:
     if output_format == "recipe":
         # Handle recipe mode
         user_recipe_conversations[user_id].append({"role": "user", "content": user_text})
+        summarizer.add_message(user_id, user_recipe_conversations[user_id][-1])
+
+        # Fill recipe slots locally and ask follow-up questions without calling the API
+        needs_llm = recipe_slot_filler.update(user_recipe_info[user_id], user_text)
+        if not needs_llm and not recipe_slot_filler.is_complete(user_recipe_info[user_id]):
+            question = recipe_slot_filler.next_question(user_recipe_info[user_id])
+            user_recipe_conversations[user_id].append({"role": "assistant", "content": question})
+            await message.answer(question, reply_markup=get_reply_keyboard())
+            logger.info(f"Sent local recipe question to user {user_id}")
+            return
 
         # Check if summarization needed BEFORE sending to API
         user_msg_count = count_user_messages(user_id, output_format)
         if user_msg_count >= 5:
             logger.info(f"Pre-summarization triggered for user {user_id} in recipe mode (count: {user_msg_count})")
-            await create_summary(user_id, user_model_preferences[user_id], output_format)
-            # Clear old conversation but keep current message
+            await create_summary(user_id, output_format)
+            # Clear old conversation but keep current message, collected slots stay in user_recipe_info
             current_message = user_recipe_conversations[user_id][-1]
             user_recipe_conversations[user_id].clear()
-            user_recipe_info[user_id].clear()
             user_recipe_conversations[user_id].append(current_message)
             logger.info(f"Cleared recipe history, kept current message for user {user_id}")
 
         messages_to_send = filter_conversation_messages(list(user_recipe_conversations[user_id]))
+
+        # Pass locally collected answers so the model does not ask for them again
+        collected_slots = recipe_slot_filler.format_slots(user_recipe_info[user_id])
+        if collected_slots:
+            messages_to_send[-1] = {"role": "user", "content": f"{user_text}\n\n(Собранные ответы: {collected_slots})"}
     else:
         # Handle text/json modes
         user_conversations[user_id].append({"role": "user", "content": user_text})
+        summarizer.add_message(user_id, user_conversations[user_id][-1])
 
         # Check if summarization needed BEFORE sending to API
         user_msg_count = count_user_messages(user_id, output_format)
         if user_msg_count >= 5:
             logger.info(f"Pre-summarization triggered for user {user_id} in {output_format} mode (count: {user_msg_count})")
-            await create_summary(user_id, user_model_preferences[user_id], output_format)
+            await create_summary(user_id, output_format)
             # Clear old conversation but keep current message
             current_message = user_conversations[user_id][-1]
             user_conversations[user_id].clear()
@@ -350,12 +351,16 @@ async def handle_message(message: Message) -> None:
                     summary_storage.delete_summary(user_id)
                     logger.info(f"Sent final recipe to user {user_id} and cleared context and summary")
                 else:
+                    summarizer.add_message(user_id, user_recipe_conversations[user_id][-1])
+                    # Let the next answer fill the slot the chef asked about
+                    recipe_slot_filler.expect_answer(user_recipe_info[user_id], response_content)
                     response_with_tokens = f"{response_content}\n\n{token_info}"
                     await message.answer(response_with_tokens, reply_markup=get_reply_keyboard())
                     logger.info(f"Sent recipe question/response to user {user_id}")
             else:
                 # Preserve existing text/json functionality
                 user_conversations[user_id].append({"role": "assistant", "content": response_content})
+                summarizer.add_message(user_id, user_conversations[user_id][-1])
 
                 if output_format == "json":
                     formatted_response = f"```json\n{response_content}\n```\n\n{token_info}"